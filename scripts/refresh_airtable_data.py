@@ -11,22 +11,39 @@ from __future__ import annotations
 import argparse
 import csv
 import hashlib
+import io
 import json
 import os
 import re
 import shutil
 import sys
+import threading
 import time
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
 from dataclasses import dataclass
 from datetime import datetime, timezone
+from email.message import Message
+from functools import lru_cache
 from pathlib import Path
-from typing import Any, Iterable
+from typing import Any, Callable, Iterable, Iterator, Sequence
 from urllib.error import HTTPError, URLError
-from urllib.parse import urlencode
-from urllib.request import Request, urlopen
+from urllib.parse import urlencode, urlsplit
+from urllib.request import Request, getproxies, proxy_bypass, urlopen
+
+try:
+    import orjson
+except Exception:  # pragma: no cover - optional dependency
+    orjson = None
+
+try:
+    import urllib3
+except Exception:  # pragma: no cover - optional dependency
+    urllib3 = None
 
 from build_site_data import BuildConfig, build_site_data_assets
 
+AIRTABLE_API_URL = "https://api.airtable.com/v0"
 DEFAULT_BASE_ID = "appyDwtN9iiA9sjEe"
 DEFAULT_EVENTS_TABLE_ID = "tblxd8PLtQOl1dRa7"
 DEFAULT_EVENTS_VIEW_ID = "viwUWtXt3UUxE6LOC"
@@ -43,6 +60,7 @@ BLOCKED_MEDIA_EXTENSIONS = {"tif", "tiff"}
 PDF_EXTENSIONS = {"pdf"}
 RECORD_ID_HEADER = "_Airtable Record ID"
 MEDIA_REFERENCE_PATTERN = re.compile(r"data/media/([^),\s]+)")
+UNSAFE_FILENAME_PATTERN = re.compile(r"[^A-Za-z0-9._-]+")
 LAST_MODIFIED_FIELD_CANDIDATES = [
     "Last Modified",
     "Last Modified Time",
@@ -66,6 +84,15 @@ PEOPLE_JSON_OUTPUT_DEFAULT = "data/people.json"
 LOCATIONS_JSON_OUTPUT_DEFAULT = "data/locations.json"
 TAGS_JSON_OUTPUT_DEFAULT = "data/tags.json"
 MEDIA_MANIFEST_OUTPUT_DEFAULT = "data/media-manifest.json"
+MEDIA_DOWNLOAD_WORKERS = 16
+DOWNLOAD_COPY_BUFFER_BYTES = 1024 * 1024
+MEDIA_INDEX_FILENAME = ".index.json"
+HTTP_MAX_REDIRECTS = 5
+HTTP_POOL_CONNECTIONS_PER_HOST = MEDIA_DOWNLOAD_WORKERS * 4
+# Airtable allows 5 API requests per second per base and answers bursts with a 30 second lockout.
+AIRTABLE_MIN_REQUEST_INTERVAL_SECONDS = 0.2
+AIRTABLE_REQUEST_ATTEMPTS = 4
+AIRTABLE_RATE_LIMIT_BACKOFF_SECONDS = 30
 
 EVENTS_DEFAULT_HEADERS = [
     "Event Name",
@@ -122,6 +149,13 @@ class RefreshResult:
     last_modified_field: str
 
 
+class AirtableRequestError(RuntimeError):
+    def __init__(self, message: str, *, status: int = 0, error_type: str = "") -> None:
+        super().__init__(message)
+        self.status = status
+        self.error_type = error_type
+
+
 def parse_args() -> argparse.Namespace:
     parser = argparse.ArgumentParser(
         description="Refresh Airtable exports for events, people, locations, tags, and optional elements."
@@ -392,25 +426,42 @@ def main() -> int:
     else:
         print("[elements] Elements refresh disabled (no table/view ids configured).")
 
-    used_media_files: set[str] = set()
-    for target in targets:
-        result = refresh_target(
-            token=token,
-            base_id=args.base_id,
-            target=target,
-            media_dir=media_dir,
-            cache_media=cache_media,
-            cache_media_types=cache_media_types,
-            used_media_files=used_media_files,
-            download_budget=download_budget,
-            max_media_file_bytes=max_media_file_bytes,
-            sync_mode=args.sync_mode,
-        )
-        print(
-            f"[{target.name}] {result.mode} sync complete: "
-            f"{result.record_count} records ({result.changed_records} changed)."
-        )
-        sync_root_fallback_csv(target)
+    media_index_path = media_dir / MEDIA_INDEX_FILENAME
+    media_index = read_media_index(media_index_path) if cache_media else {}
+    cached_media_files = scan_media_files(media_dir) if cache_media else set()
+    # A download budget keeps targets sequential so it is spent in target order.
+    target_media_files: list[set[str]] = [set() for _ in targets]
+    target_workers = 1 if download_budget is not None else len(targets)
+    try:
+        with ThreadPoolExecutor(max_workers=target_workers) as target_executor:
+            futures = [
+                target_executor.submit(
+                    refresh_target,
+                    token=token,
+                    base_id=args.base_id,
+                    target=target,
+                    media_dir=media_dir,
+                    cache_media=cache_media,
+                    cache_media_types=cache_media_types,
+                    used_media_files=used_files,
+                    download_budget=download_budget,
+                    media_index=media_index,
+                    cached_media_files=cached_media_files,
+                    max_media_file_bytes=max_media_file_bytes,
+                    sync_mode=args.sync_mode,
+                )
+                for target, used_files in zip(targets, target_media_files)
+            ]
+            for target, future in zip(targets, futures):
+                result = future.result()
+                print(
+                    f"[{target.name}] {result.mode} sync complete: "
+                    f"{result.record_count} records ({result.changed_records} changed)."
+                )
+                sync_root_fallback_csv(target)
+    finally:
+        HTTP_CLIENT.close()
+    used_media_files = set().union(*target_media_files)
 
     write_site_data_bundle(bundle_output=Path(args.bundle_output_js), targets=targets)
     build_site_data_assets(
@@ -438,7 +489,10 @@ def main() -> int:
     )
 
     if cache_media and args.prune_media:
-        prune_stale_media(media_dir, used_media_files)
+        for name in prune_stale_media(media_dir, used_media_files, cached_media_files):
+            media_index.pop(name, None)
+    if cache_media:
+        write_media_index(media_index_path, media_index)
 
     print("Refresh complete.")
     return 0
@@ -454,6 +508,8 @@ def refresh_target(
     cache_media_types: set[str] | None,
     used_media_files: set[str],
     download_budget: dict[str, int] | None,
+    media_index: dict[str, dict[str, Any]],
+    cached_media_files: set[str],
     max_media_file_bytes: int,
     sync_mode: str,
 ) -> RefreshResult:
@@ -461,9 +517,9 @@ def refresh_target(
     target.metadata_path.parent.mkdir(parents=True, exist_ok=True)
 
     previous_metadata = read_json_file(target.metadata_path)
-    existing_headers, existing_rows_by_id = read_existing_rows_by_record_id(target.output_csv)
 
     if sync_mode == "delta":
+        existing_headers, existing_rows_by_id = read_existing_rows_by_record_id(target.output_csv)
         result = refresh_target_delta(
             token=token,
             base_id=base_id,
@@ -473,6 +529,8 @@ def refresh_target(
             cache_media_types=cache_media_types,
             used_media_files=used_media_files,
             download_budget=download_budget,
+            media_index=media_index,
+            cached_media_files=cached_media_files,
             max_media_file_bytes=max_media_file_bytes,
             previous_metadata=previous_metadata,
             existing_headers=existing_headers,
@@ -491,6 +549,8 @@ def refresh_target(
         cache_media_types=cache_media_types,
         used_media_files=used_media_files,
         download_budget=download_budget,
+        media_index=media_index,
+        cached_media_files=cached_media_files,
         max_media_file_bytes=max_media_file_bytes,
         previous_metadata=previous_metadata,
     )
@@ -506,10 +566,12 @@ def refresh_target_delta(
     cache_media_types: set[str] | None,
     used_media_files: set[str],
     download_budget: dict[str, int] | None,
+    media_index: dict[str, dict[str, Any]],
+    cached_media_files: set[str],
     max_media_file_bytes: int,
     previous_metadata: dict[str, Any],
     existing_headers: list[str],
-    existing_rows_by_id: dict[str, dict[str, str]],
+    existing_rows_by_id: dict[str, list[str]],
 ) -> RefreshResult | None:
     if not existing_rows_by_id or RECORD_ID_HEADER not in existing_headers:
         return None
@@ -541,7 +603,7 @@ def refresh_target_delta(
         if not cache_media:
             continue
         for media_name in row_references:
-            if not (media_dir / media_name).exists():
+            if media_name not in cached_media_files:
                 missing_cached_files += 1
 
     if missing_cached_files:
@@ -569,20 +631,52 @@ def refresh_target_delta(
         raise
 
     headers = ensure_record_id_header(existing_headers)
-    changed_count = 0
-
-    for record in changed_records:
+    identified_records = [record for record in changed_records if normalize_text(record.get("id"))]
+    incoming_fields: dict[str, None] = {}
+    published_records: list[dict[str, Any]] = []
+    for record in identified_records:
         fields = record.get("fields", {})
-        record_id = normalize_text(record.get("id"))
-        if not record_id:
-            continue
-
+        incoming_fields.update(dict.fromkeys(fields))
+        if not published_field or is_published(fields.get(published_field)):
+            published_records.append(record)
+    if identified_records:
         headers = merge_headers(
             headers=headers,
-            incoming_fields=fields.keys(),
+            incoming_fields=incoming_fields,
             preferred_headers=target.preferred_headers,
         )
 
+    prefetch_attachments(
+        records=published_records,
+        headers=headers,
+        media_dir=media_dir,
+        cache_media=cache_media,
+        cache_media_types=cache_media_types,
+        download_budget=download_budget,
+        media_index=media_index,
+        cached_media_files=cached_media_files,
+        max_media_file_bytes=max_media_file_bytes,
+    )
+
+    build_row = make_row_builder(
+        headers=headers,
+        media_dir=media_dir,
+        cache_media=cache_media,
+        cache_media_types=cache_media_types,
+        used_media_files=used_media_files,
+        cached_media_files=cached_media_files,
+        max_media_file_bytes=max_media_file_bytes,
+    )
+    if headers[: len(existing_headers)] != existing_headers:
+        existing_positions = {header: index for index, header in enumerate(existing_headers)}
+        slots = [existing_positions.get(header, -1) for header in headers]
+        for record_id, row in existing_rows_by_id.items():
+            existing_rows_by_id[record_id] = [row[slot] if slot >= 0 else "" for slot in slots]
+
+    changed_count = 0
+    for record in identified_records:
+        fields = record.get("fields", {})
+        record_id = normalize_text(record.get("id"))
         old_row = existing_rows_by_id.get(record_id)
         if old_row:
             used_media_files.difference_update(extract_media_references_from_row(old_row))
@@ -592,31 +686,28 @@ def refresh_target_delta(
             changed_count += 1
             continue
 
-        row = record_to_csv_row(
-            record=record,
-            headers=headers,
-            media_dir=media_dir,
-            cache_media=cache_media,
-            cache_media_types=cache_media_types,
-            used_media_files=used_media_files,
-            download_budget=download_budget,
-            max_media_file_bytes=max_media_file_bytes,
-        )
+        row = build_row(record)
         existing_rows_by_id[record_id] = row
         changed_count += 1
 
-    rows = list(existing_rows_by_id.values())
-    write_csv(target.output_csv, headers, rows)
+    width = len(headers)
+    write_csv(
+        target.output_csv,
+        headers,
+        (row if len(row) == width else row + [""] * (width - len(row)) for row in existing_rows_by_id.values()),
+    )
+    record_count = len(existing_rows_by_id)
 
-    updated_last_modified_field = discover_field_name_from_records(changed_records, target.last_modified_field_candidates)
+    updated_published_field, updated_last_modified_field, changed_cursor = summarize_records(
+        changed_records,
+        published_field_candidates=target.published_field_candidates,
+        last_modified_field_candidates=target.last_modified_field_candidates,
+    )
     if not updated_last_modified_field:
         updated_last_modified_field = last_modified_field
-
-    updated_published_field = discover_field_name_from_records(changed_records, target.published_field_candidates)
     if not updated_published_field:
         updated_published_field = published_field
 
-    changed_cursor = compute_max_modified_cursor(changed_records, updated_last_modified_field)
     sync_cursor = latest_timestamp_iso(previous_cursor, changed_cursor) or datetime.now(timezone.utc).isoformat()
 
     write_metadata(
@@ -624,7 +715,7 @@ def refresh_target_delta(
         metadata={
             "generated_at_utc": datetime.now(timezone.utc).isoformat(),
             "dataset": target.name,
-            "record_count": len(rows),
+            "record_count": record_count,
             "media_cached": cache_media,
             "media_files_in_use": len(used_media_files),
             "base_id": base_id,
@@ -640,7 +731,7 @@ def refresh_target_delta(
 
     return RefreshResult(
         mode="delta",
-        record_count=len(rows),
+        record_count=record_count,
         changed_records=changed_count,
         sync_cursor_utc=sync_cursor,
         published_field=updated_published_field,
@@ -658,6 +749,8 @@ def refresh_target_full(
     cache_media_types: set[str] | None,
     used_media_files: set[str],
     download_budget: dict[str, int] | None,
+    media_index: dict[str, dict[str, Any]],
+    cached_media_files: set[str],
     max_media_file_bytes: int,
     previous_metadata: dict[str, Any],
 ) -> RefreshResult:
@@ -672,54 +765,85 @@ def refresh_target_full(
 
     print(f"[{target.name}] Fetching full dataset from Airtable ...")
     records: list[dict[str, Any]]
-    try:
-        records = fetch_all_records(
-            token=token,
-            base_id=base_id,
-            table_id=target.table_id,
-            view_id=target.view_id,
-            filter_formula=full_formula,
-        )
-    except RuntimeError as exc:
-        if full_formula and is_unknown_field_error(exc):
-            records = fetch_all_records(
-                token=token,
-                base_id=base_id,
-                table_id=target.table_id,
-                view_id=target.view_id,
-                filter_formula=None,
+    downloads: dict[str, Future[dict[str, Any] | None]] = {}
+    budget_waitlist: dict[str, dict[str, Any]] = {}
+    with ThreadPoolExecutor(max_workers=MEDIA_DOWNLOAD_WORKERS) as executor:
+
+        def fetch(filter_formula: str | None, published_field_hint: str) -> list[dict[str, Any]]:
+            return collect_records_prefetching_attachments(
+                pages=iter_record_pages(
+                    token=token,
+                    base_id=base_id,
+                    table_id=target.table_id,
+                    view_id=target.view_id,
+                    filter_formula=filter_formula,
+                ),
+                target=target,
+                published_field_hint=published_field_hint,
+                executor=executor,
+                downloads=downloads,
+                budget_waitlist=budget_waitlist,
+                media_dir=media_dir,
+                cache_media=cache_media,
+                cache_media_types=cache_media_types,
+                download_budget=download_budget,
+                media_index=media_index,
+                cached_media_files=cached_media_files,
+                max_media_file_bytes=max_media_file_bytes,
             )
-            previous_published_field = ""
-        else:
+
+        try:
+            try:
+                records = fetch(full_formula, previous_published_field)
+            except RuntimeError as exc:
+                if full_formula and is_unknown_field_error(exc):
+                    records = fetch(None, "")
+                    previous_published_field = ""
+                else:
+                    raise
+            wait_for_attachment_downloads(
+                executor=executor,
+                downloads=downloads,
+                budget_waitlist=budget_waitlist,
+                download_budget=download_budget,
+                media_index=media_index,
+                cached_media_files=cached_media_files,
+            )
+        except BaseException:
+            executor.shutdown(wait=True, cancel_futures=True)
             raise
 
-    discovered_published_field = discover_field_name_from_records(records, target.published_field_candidates)
-    discovered_last_modified_field = discover_field_name_from_records(records, target.last_modified_field_candidates)
+    discovered_published_field, discovered_last_modified_field, sync_cursor = summarize_records(
+        records,
+        published_field_candidates=target.published_field_candidates,
+        last_modified_field_candidates=target.last_modified_field_candidates,
+    )
 
     published_field = discovered_published_field or previous_published_field
     if published_field:
-        records = [record for record in records if is_published(record.get("fields", {}).get(published_field))]
+        published_records = [
+            record for record in records if is_published(record.get("fields", {}).get(published_field))
+        ]
+        if len(published_records) != len(records):
+            records = published_records
+            sync_cursor = compute_max_modified_cursor(records, discovered_last_modified_field)
 
     headers = compute_headers(records, preferred_headers=target.preferred_headers)
     headers = ensure_record_id_header(headers)
 
-    rows: list[dict[str, str]] = []
-    for record in records:
-        row = record_to_csv_row(
-            record=record,
-            headers=headers,
-            media_dir=media_dir,
-            cache_media=cache_media,
-            cache_media_types=cache_media_types,
-            used_media_files=used_media_files,
-            download_budget=download_budget,
-            max_media_file_bytes=max_media_file_bytes,
-        )
-        rows.append(row)
-
+    build_row = make_row_builder(
+        headers=headers,
+        media_dir=media_dir,
+        cache_media=cache_media,
+        cache_media_types=cache_media_types,
+        used_media_files=used_media_files,
+        cached_media_files=cached_media_files,
+        max_media_file_bytes=max_media_file_bytes,
+    )
+    rows = (build_row(record) for record in records)
     write_csv(target.output_csv, headers, rows)
+    record_count = len(records)
 
-    sync_cursor = compute_max_modified_cursor(records, discovered_last_modified_field)
     if not sync_cursor:
         sync_cursor = datetime.now(timezone.utc).isoformat()
 
@@ -728,14 +852,14 @@ def refresh_target_full(
         metadata={
             "generated_at_utc": datetime.now(timezone.utc).isoformat(),
             "dataset": target.name,
-            "record_count": len(rows),
+            "record_count": record_count,
             "media_cached": cache_media,
             "media_files_in_use": len(used_media_files),
             "base_id": base_id,
             "table_id": target.table_id,
             "view_id": target.view_id,
             "sync_mode": "full",
-            "changed_records": len(rows),
+            "changed_records": record_count,
             "published_field": published_field,
             "last_modified_field": discovered_last_modified_field,
             "sync_cursor_utc": sync_cursor,
@@ -744,8 +868,8 @@ def refresh_target_full(
 
     return RefreshResult(
         mode="full",
-        record_count=len(rows),
-        changed_records=len(rows),
+        record_count=record_count,
+        changed_records=record_count,
         sync_cursor_utc=sync_cursor,
         published_field=published_field,
         last_modified_field=discovered_last_modified_field,
@@ -761,52 +885,256 @@ def fetch_all_records(
     filter_formula: str | None,
 ) -> list[dict[str, Any]]:
     records: list[dict[str, Any]] = []
-    offset = None
+    for page in iter_record_pages(
+        token=token,
+        base_id=base_id,
+        table_id=table_id,
+        view_id=view_id,
+        filter_formula=filter_formula,
+    ):
+        records.extend(page)
+    return records
 
-    while True:
+
+def iter_record_pages(
+    *,
+    token: str,
+    base_id: str,
+    table_id: str,
+    view_id: str,
+    filter_formula: str | None,
+) -> Iterator[list[dict[str, Any]]]:
+    def page_url(offset: str | None) -> str:
         params = {"pageSize": "100", "view": view_id}
         if filter_formula:
             params["filterByFormula"] = filter_formula
         if offset:
             params["offset"] = offset
-        url = f"https://api.airtable.com/v0/{base_id}/{table_id}?{urlencode(params)}"
+        return f"{AIRTABLE_API_URL}/{base_id}/{table_id}?{urlencode(params)}"
+
+    with ThreadPoolExecutor(max_workers=1) as page_executor:
+        pending: Future[dict[str, Any]] | None = page_executor.submit(get_json, page_url(None), token)
+        while pending is not None:
+            payload = pending.result()
+            offset = payload.get("offset")
+            pending = page_executor.submit(get_json, page_url(offset), token) if offset else None
+            yield payload.get("records", [])
 
-        payload = get_json(url, token)
-        chunk = payload.get("records", [])
-        records.extend(chunk)
-        offset = payload.get("offset")
-        if not offset:
-            break
+
+def collect_records_prefetching_attachments(
+    *,
+    pages: Iterable[list[dict[str, Any]]],
+    target: ExportTarget,
+    published_field_hint: str,
+    executor: ThreadPoolExecutor,
+    downloads: dict[str, Future[dict[str, Any] | None]],
+    budget_waitlist: dict[str, dict[str, Any]],
+    media_dir: Path,
+    cache_media: bool,
+    cache_media_types: set[str] | None,
+    download_budget: dict[str, int] | None,
+    media_index: dict[str, dict[str, Any]],
+    cached_media_files: set[str],
+    max_media_file_bytes: int,
+) -> list[dict[str, Any]]:
+    records: list[dict[str, Any]] = []
+    found_fields: set[str] = set()
+    header_order: dict[str, None] = dict.fromkeys(target.preferred_headers)
+    deferred: list[dict[str, Any]] = []
+
+    for page in pages:
+        records.extend(page)
+        if not cache_media:
+            continue
+
+        # Records wait until the published field is known so unpublished attachments never use the budget.
+        for record in page:
+            found_fields.update(record.get("fields", {}).keys())
+        deferred.extend(page)
+        published_field = first_matching_name(found_fields, target.published_field_candidates) or published_field_hint
+        if not published_field:
+            continue
+        ready = [record for record in deferred if is_published(record.get("fields", {}).get(published_field))]
+        deferred = []
+        for record in ready:
+            header_order.update(dict.fromkeys(record.get("fields", {})))
+        submit_attachment_downloads(
+            records=ready,
+            headers=header_order,
+            executor=executor,
+            downloads=downloads,
+            budget_waitlist=budget_waitlist,
+            media_dir=media_dir,
+            cache_media_types=cache_media_types,
+            download_budget=download_budget,
+            media_index=media_index,
+            cached_media_files=cached_media_files,
+            max_media_file_bytes=max_media_file_bytes,
+        )
+
+    if deferred:
+        for record in deferred:
+            header_order.update(dict.fromkeys(record.get("fields", {})))
+        submit_attachment_downloads(
+            records=deferred,
+            headers=header_order,
+            executor=executor,
+            downloads=downloads,
+            budget_waitlist=budget_waitlist,
+            media_dir=media_dir,
+            cache_media_types=cache_media_types,
+            download_budget=download_budget,
+            media_index=media_index,
+            cached_media_files=cached_media_files,
+            max_media_file_bytes=max_media_file_bytes,
+        )
 
     return records
 
 
+class PooledHttpClient:
+    def __init__(self) -> None:
+        self._proxies = getproxies()
+        self._pool = None
+        if urllib3 is not None:
+            self._pool = urllib3.PoolManager(
+                maxsize=HTTP_POOL_CONNECTIONS_PER_HOST,
+                retries=urllib3.Retry(total=None, connect=0, read=0, status=0, other=0, redirect=HTTP_MAX_REDIRECTS),
+            )
+
+    @contextmanager
+    def open(self, url: str, *, headers: dict[str, str], timeout: float) -> Iterator[Any]:
+        # urlopen covers installs without urllib3 and requests routed through an environment proxy.
+        if self._pool is None or self._uses_proxy(url):
+            with urlopen(Request(url, headers=headers), timeout=timeout) as response:
+                yield response
+            return
+
+        try:
+            response = self._pool.request("GET", url, headers=headers, timeout=timeout, preload_content=False)
+        except urllib3.exceptions.HTTPError as exc:
+            raise URLError(exc) from exc
+        try:
+            if not 200 <= response.status < 300:
+                body = response.read()
+                error_headers = Message()
+                for name, value in response.headers.items():
+                    error_headers[name] = value
+                raise HTTPError(url, response.status, response.reason or "", error_headers, io.BytesIO(body))
+            yield response
+        except urllib3.exceptions.HTTPError as exc:
+            raise URLError(exc) from exc
+        finally:
+            if response.closed:
+                response.release_conn()
+            else:
+                # Unread body bytes would corrupt the next response on this socket.
+                response.close()
+
+    def close(self) -> None:
+        if self._pool is not None:
+            self._pool.clear()
+
+    def _uses_proxy(self, url: str) -> bool:
+        parts = urlsplit(url)
+        return bool(self._proxies.get(parts.scheme)) and not proxy_bypass(parts.hostname or "")
+
+
+class RequestThrottle:
+    def __init__(self, interval_seconds: float) -> None:
+        self._interval_seconds = interval_seconds
+        self._lock = threading.Lock()
+        self._next_request_at = 0.0
+
+    def wait(self) -> None:
+        with self._lock:
+            now = time.monotonic()
+            if now < self._next_request_at:
+                time.sleep(self._next_request_at - now)
+                now = self._next_request_at
+            self._next_request_at = now + self._interval_seconds
+
+
+HTTP_CLIENT = PooledHttpClient()
+AIRTABLE_THROTTLE = RequestThrottle(AIRTABLE_MIN_REQUEST_INTERVAL_SECONDS)
+
+
 def get_json(url: str, token: str) -> dict[str, Any]:
-    request = Request(url)
-    request.add_header("Authorization", f"Bearer {token}")
-    request.add_header("Accept", "application/json")
+    attempts = AIRTABLE_REQUEST_ATTEMPTS
+    headers = airtable_request_headers(token)
+    error = AirtableRequestError(f"Airtable request was not attempted: {url}")
+    cause: Exception | None = None
+    delay = 0.0
+    for attempt in range(1, attempts + 1):
+        if delay:
+            time.sleep(delay)
+        AIRTABLE_THROTTLE.wait()
+        try:
+            with HTTP_CLIENT.open(url, headers=headers, timeout=60) as response:
+                return parse_json_bytes(response.read())
+        except HTTPError as exc:
+            body = exc.read().decode("utf-8", errors="replace")
+            error = AirtableRequestError(
+                f"Airtable request failed ({exc.code}): {body}",
+                status=exc.code,
+                error_type=airtable_error_type(body),
+            )
+            cause = exc
+            if error.status == 429:
+                delay = retry_after_seconds(exc, default=AIRTABLE_RATE_LIMIT_BACKOFF_SECONDS)
+            elif 500 <= error.status <= 599:
+                delay = attempt * 2
+            else:
+                break
+        except URLError as exc:
+            error = AirtableRequestError(f"Network error while contacting Airtable: {exc.reason}")
+            cause = exc
+            delay = attempt * 2
+    raise error from cause
+
+
+@lru_cache(maxsize=None)
+def airtable_request_headers(token: str) -> dict[str, str]:
+    return {"Authorization": f"Bearer {token}", "Accept": "application/json"}
+
+
+def retry_after_seconds(error: HTTPError, *, default: float) -> float:
+    value = normalize_text(error.headers.get("Retry-After") if error.headers else "")
+    return float(value) if value.isdigit() else default
+
+
+def airtable_error_type(body: str) -> str:
     try:
-        with urlopen(request, timeout=60) as response:
-            return json.loads(response.read().decode("utf-8"))
-    except HTTPError as exc:
-        body = exc.read().decode("utf-8", errors="replace")
-        raise RuntimeError(f"Airtable request failed ({exc.code}): {body}") from exc
-    except URLError as exc:
-        raise RuntimeError(f"Network error while contacting Airtable: {exc.reason}") from exc
+        payload = parse_json_bytes(body.encode("utf-8"))
+    except ValueError:
+        return ""
+    error = payload.get("error") if isinstance(payload, dict) else None
+    if not isinstance(error, dict):
+        return normalize_text(error)
+    error_type = normalize_text(error.get("type"))
+    # Formula errors report unknown fields as INVALID_FILTER_BY_FORMULA, naming them only in the message.
+    if error_type == "INVALID_FILTER_BY_FORMULA" and "Unknown field names" in normalize_text(error.get("message")):
+        return "UNKNOWN_FIELD_NAME"
+    return error_type
+
+
+def parse_json_bytes(data: bytes) -> Any:
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def dump_compact_json(value: Any) -> str:
+    if orjson is not None:
+        return orjson.dumps(value).decode("utf-8")
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":"))
 
 
 def compute_headers(records: Iterable[dict[str, Any]], preferred_headers: list[str] | None = None) -> list[str]:
-    preferred = preferred_headers or []
-    seen: set[str] = set(preferred)
-    extras: list[str] = []
+    ordered: dict[str, Any] = dict.fromkeys(preferred_headers or [])
     for record in records:
-        fields = record.get("fields", {})
-        for key in fields.keys():
-            if key in seen:
-                continue
-            seen.add(key)
-            extras.append(key)
-    return preferred + extras
+        ordered.update(record.get("fields", {}))
+    return list(ordered)
 
 
 def merge_headers(headers: list[str], incoming_fields: Iterable[str], preferred_headers: list[str]) -> list[str]:
@@ -831,36 +1159,42 @@ def ensure_record_id_header(headers: list[str]) -> list[str]:
     return [RECORD_ID_HEADER, *filtered]
 
 
-def record_to_csv_row(
+def make_row_builder(
     *,
-    record: dict[str, Any],
     headers: list[str],
     media_dir: Path,
     cache_media: bool,
     cache_media_types: set[str] | None,
     used_media_files: set[str],
-    download_budget: dict[str, int] | None,
+    cached_media_files: set[str],
     max_media_file_bytes: int,
-) -> dict[str, str]:
-    fields = record.get("fields", {})
-    row: dict[str, str] = {}
-
-    for header in headers:
-        if header == RECORD_ID_HEADER:
-            row[header] = normalize_text(record.get("id"))
-            continue
-        value = fields.get(header, "")
-        row[header] = stringify_value(
+) -> Callable[[dict[str, Any]], list[str]]:
+    header_slots = tuple(headers)
+    record_id_index = headers.index(RECORD_ID_HEADER) if RECORD_ID_HEADER in headers else -1
+    formatted_attachments: dict[tuple[Any, ...], tuple[str, frozenset[str]]] = {}
+
+    def format_value(value: Any) -> str:
+        if value.__class__ is str:
+            return value
+        return stringify_value(
             value=value,
             media_dir=media_dir,
             cache_media=cache_media,
             cache_media_types=cache_media_types,
             used_media_files=used_media_files,
-            download_budget=download_budget,
+            cached_media_files=cached_media_files,
             max_media_file_bytes=max_media_file_bytes,
+            formatted_attachments=formatted_attachments,
         )
 
-    return row
+    def build_row(record: dict[str, Any]) -> list[str]:
+        get_field = record.get("fields", {}).get
+        row = [format_value(get_field(header, "")) for header in header_slots]
+        if record_id_index >= 0:
+            row[record_id_index] = normalize_text(record.get("id"))
+        return row
+
+    return build_row
 
 
 def stringify_value(
@@ -870,13 +1204,17 @@ def stringify_value(
     cache_media: bool,
     cache_media_types: set[str] | None,
     used_media_files: set[str],
-    download_budget: dict[str, int] | None,
+    cached_media_files: set[str],
     max_media_file_bytes: int,
+    formatted_attachments: dict[tuple[Any, ...], tuple[str, frozenset[str]]],
 ) -> str:
+    value_class = value.__class__
+    if value_class is str:
+        return value
     if value is None:
         return ""
 
-    if isinstance(value, list):
+    if value_class is list:
         if is_attachment_list(value):
             return format_attachments(
                 attachments=value,
@@ -884,12 +1222,13 @@ def stringify_value(
                 cache_media=cache_media,
                 cache_media_types=cache_media_types,
                 used_media_files=used_media_files,
-                download_budget=download_budget,
+                cached_media_files=cached_media_files,
                 max_media_file_bytes=max_media_file_bytes,
+                formatted_attachments=formatted_attachments,
             )
         return ",".join(filter(None, (stringify_scalar(item) for item in value)))
 
-    if isinstance(value, dict):
+    if value_class is dict:
         return json.dumps(value, sort_keys=True, ensure_ascii=False)
 
     return stringify_scalar(value)
@@ -898,14 +1237,22 @@ def stringify_value(
 def is_attachment_list(items: list[Any]) -> bool:
     if not items:
         return False
-    return all(isinstance(item, dict) and "url" in item for item in items)
+    # Airtable cell arrays are homogeneous, so the first item identifies an attachment field.
+    first = items[0]
+    return isinstance(first, dict) and "url" in first and "filename" in first
 
 
 def stringify_scalar(value: Any) -> str:
+    if isinstance(value, str):
+        return value
     if isinstance(value, bool):
         return "true" if value else "false"
-    if isinstance(value, (str, int, float)):
+    if isinstance(value, (int, float)):
         return str(value)
+    if value is None:
+        return ""
+    if isinstance(value, (bytes, bytearray)):
+        return value.decode("utf-8", errors="replace")
     return json.dumps(value, sort_keys=True, ensure_ascii=False)
 
 
@@ -916,52 +1263,243 @@ def format_attachments(
     cache_media: bool,
     cache_media_types: set[str] | None,
     used_media_files: set[str],
-    download_budget: dict[str, int] | None,
+    cached_media_files: set[str],
     max_media_file_bytes: int,
+    formatted_attachments: dict[tuple[Any, ...], tuple[str, frozenset[str]]],
 ) -> str:
+    if not cache_media:
+        return ""
+
+    cache_key = tuple(
+        (attachment.get("id"), attachment.get("url"), attachment.get("filename")) for attachment in attachments
+    )
+    cached = formatted_attachments.get(cache_key)
+    if cached is not None:
+        cached_text, cached_files = cached
+        used_media_files.update(cached_files)
+        return cached_text
+
     output_parts: list[str] = []
+    local_filenames: set[str] = set()
     for attachment in attachments:
-        source_url = str(attachment.get("url", "")).strip()
-        if not source_url:
+        resolved = resolve_cached_attachment(
+            attachment=attachment,
+            cache_media_types=cache_media_types,
+            max_media_file_bytes=max_media_file_bytes,
+        )
+        if resolved is None:
             continue
-
-        filename = sanitize_filename(str(attachment.get("filename", "")).strip(), source_url)
-        if is_blocked_media(filename, source_url):
+        _, filename, local_filename = resolved
+        if local_filename not in cached_media_files:
             continue
-        attachment_id = str(attachment.get("id", "")).strip() or short_hash(source_url)
-        local_filename = f"{attachment_id}_{filename}"
-        local_path = media_dir / local_filename
-        attachment_type = classify_attachment_type(attachment=attachment, filename=filename, source_url=source_url)
-        should_cache = cache_media and (cache_media_types is None or attachment_type in cache_media_types)
+        local_filenames.add(local_filename)
+        link_target = f"data/media/{local_filename}"
+        output_parts.append(f"{filename} ({link_target})")
+    used_media_files.update(local_filenames)
+    formatted = ",".join(output_parts)
+    formatted_attachments[cache_key] = (formatted, frozenset(local_filenames))
+    return formatted
 
-        if not should_cache:
-            continue
 
-        source_size = attachment.get("size")
-        if isinstance(source_size, (int, float)) and int(source_size) > max_media_file_bytes:
+def resolve_cached_attachment(
+    *,
+    attachment: dict[str, Any],
+    cache_media_types: set[str] | None,
+    max_media_file_bytes: int,
+    report_oversized: bool = False,
+) -> tuple[str, str, str] | None:
+    source_url = str(attachment.get("url", "")).strip()
+    if not source_url:
+        return None
+
+    filename = sanitize_filename(str(attachment.get("filename", "")).strip(), source_url)
+    if is_blocked_media(filename, source_url):
+        return None
+    if cache_media_types is not None:
+        attachment_type = classify_attachment_type(attachment=attachment, filename=filename, source_url=source_url)
+        if attachment_type not in cache_media_types:
+            return None
+
+    source_size = attachment.get("size")
+    if isinstance(source_size, (int, float)) and int(source_size) > max_media_file_bytes:
+        if report_oversized:
             print(
                 f"Skipping oversized attachment (> {max_media_file_bytes} bytes): {filename} ({int(source_size)} bytes)"
             )
-            continue
+        return None
 
-        if not local_path.exists():
-            if download_budget is not None and download_budget["remaining"] <= 0:
+    attachment_id = str(attachment.get("id", "")).strip() or short_hash(source_url)
+    return source_url, filename, f"{attachment_id}_{filename}"
+
+
+def prefetch_attachments(
+    *,
+    records: list[dict[str, Any]],
+    headers: list[str],
+    media_dir: Path,
+    cache_media: bool,
+    cache_media_types: set[str] | None,
+    download_budget: dict[str, int] | None,
+    media_index: dict[str, dict[str, Any]],
+    cached_media_files: set[str],
+    max_media_file_bytes: int,
+) -> None:
+    if not cache_media:
+        return
+
+    downloads: dict[str, Future[dict[str, Any] | None]] = {}
+    budget_waitlist: dict[str, dict[str, Any]] = {}
+    with ThreadPoolExecutor(max_workers=MEDIA_DOWNLOAD_WORKERS) as executor:
+        submit_attachment_downloads(
+            records=records,
+            headers=headers,
+            executor=executor,
+            downloads=downloads,
+            budget_waitlist=budget_waitlist,
+            media_dir=media_dir,
+            cache_media_types=cache_media_types,
+            download_budget=download_budget,
+            media_index=media_index,
+            cached_media_files=cached_media_files,
+            max_media_file_bytes=max_media_file_bytes,
+        )
+        wait_for_attachment_downloads(
+            executor=executor,
+            downloads=downloads,
+            budget_waitlist=budget_waitlist,
+            download_budget=download_budget,
+            media_index=media_index,
+            cached_media_files=cached_media_files,
+        )
+
+
+def submit_attachment_downloads(
+    *,
+    records: list[dict[str, Any]],
+    headers: Iterable[str],
+    executor: ThreadPoolExecutor,
+    downloads: dict[str, Future[dict[str, Any] | None]],
+    budget_waitlist: dict[str, dict[str, Any]],
+    media_dir: Path,
+    cache_media_types: set[str] | None,
+    download_budget: dict[str, int] | None,
+    media_index: dict[str, dict[str, Any]],
+    cached_media_files: set[str],
+    max_media_file_bytes: int,
+) -> None:
+    for record in records:
+        fields = record.get("fields", {})
+        for header in headers:
+            value = fields.get(header)
+            if not isinstance(value, list) or not is_attachment_list(value):
                 continue
-            download_binary(source_url, local_path)
-            downloaded_size = local_path.stat().st_size if local_path.exists() else 0
-            if downloaded_size > max_media_file_bytes:
-                local_path.unlink(missing_ok=True)
-                print(
-                    f"Skipping oversized downloaded file (> {max_media_file_bytes} bytes): "
-                    f"{filename} ({downloaded_size} bytes)"
+            for attachment in value:
+                resolved = resolve_cached_attachment(
+                    attachment=attachment,
+                    cache_media_types=cache_media_types,
+                    max_media_file_bytes=max_media_file_bytes,
+                    report_oversized=True,
                 )
-                continue
-            if download_budget is not None:
-                download_budget["remaining"] -= 1
-        used_media_files.add(local_filename)
-        link_target = f"data/media/{local_filename}"
-        output_parts.append(f"{filename} ({link_target})")
-    return ",".join(output_parts)
+                if resolved is None:
+                    continue
+                source_url, filename, local_filename = resolved
+                if local_filename in downloads:
+                    continue
+                local_path = media_dir / local_filename
+                validators = None
+                is_new = local_filename not in cached_media_files
+                if not is_new:
+                    declared_size = attachment.get("size")
+                    if not isinstance(declared_size, (int, float)):
+                        continue
+                    entry = media_index.get(local_filename)
+                    if entry and entry.get("size") == int(declared_size):
+                        continue
+                    try:
+                        local_size = local_path.stat().st_size
+                    except FileNotFoundError:
+                        cached_media_files.discard(local_filename)
+                        is_new = True
+                    else:
+                        if local_size == int(declared_size):
+                            if not entry:
+                                media_index[local_filename] = {"etag": "", "last_modified": "", "size": local_size}
+                            continue
+                        validators = entry if entry and entry.get("size") == local_size else None
+                download_arguments: dict[str, Any] = {
+                    "source_url": source_url,
+                    "filename": filename,
+                    "local_path": local_path,
+                    "max_media_file_bytes": max_media_file_bytes,
+                    "validators": validators,
+                }
+                if is_new and download_budget is not None:
+                    if download_budget["remaining"] <= 0:
+                        budget_waitlist.setdefault(local_filename, download_arguments)
+                        continue
+                    download_budget["remaining"] -= 1
+                downloads[local_filename] = executor.submit(download_attachment, **download_arguments)
+
+
+def wait_for_attachment_downloads(
+    *,
+    executor: ThreadPoolExecutor,
+    downloads: dict[str, Future[dict[str, Any] | None]],
+    budget_waitlist: dict[str, dict[str, Any]],
+    download_budget: dict[str, int] | None,
+    media_index: dict[str, dict[str, Any]],
+    cached_media_files: set[str],
+) -> None:
+    pending = dict(downloads)
+    while pending:
+        try:
+            for future in as_completed(pending.values()):
+                future.result()
+        except BaseException:
+            executor.shutdown(wait=True, cancel_futures=True)
+            raise
+
+        for local_filename, future in pending.items():
+            entry = future.result()
+            if entry:
+                media_index[local_filename] = entry
+                cached_media_files.add(local_filename)
+            elif download_budget is not None and local_filename not in cached_media_files:
+                download_budget["remaining"] += 1
+            else:
+                media_index.pop(local_filename, None)
+                cached_media_files.discard(local_filename)
+
+        # Refunded slots go to waitlisted attachments in discovery order, so the budget counts kept files.
+        pending = {}
+        while budget_waitlist and download_budget is not None and download_budget["remaining"] > 0:
+            local_filename = next(iter(budget_waitlist))
+            download_arguments = budget_waitlist.pop(local_filename)
+            download_budget["remaining"] -= 1
+            pending[local_filename] = downloads[local_filename] = executor.submit(
+                download_attachment, **download_arguments
+            )
+
+
+def download_attachment(
+    *,
+    source_url: str,
+    filename: str,
+    local_path: Path,
+    max_media_file_bytes: int,
+    validators: dict[str, Any] | None,
+) -> dict[str, Any] | None:
+    entry = download_binary(source_url, local_path, validators=validators, max_bytes=max_media_file_bytes)
+    if entry is None:
+        return validators
+    if entry["size"] > max_media_file_bytes:
+        local_path.unlink(missing_ok=True)
+        print(
+            f"Skipping oversized downloaded file (> {max_media_file_bytes} bytes): "
+            f"{filename} ({entry['size']} bytes)"
+        )
+        return None
+    return entry
 
 
 def classify_attachment_type(*, attachment: dict[str, Any], filename: str, source_url: str) -> str:
@@ -979,41 +1517,73 @@ def classify_attachment_type(*, attachment: dict[str, Any], filename: str, sourc
     return infer_attachment_type(filename, source_url)
 
 
+@lru_cache(maxsize=8192)
 def sanitize_filename(name: str, url: str) -> str:
     if not name:
         name = infer_name_from_url(url)
     name = name.replace(" ", "_")
-    name = re.sub(r"[^A-Za-z0-9._-]+", "_", name)
+    name = UNSAFE_FILENAME_PATTERN.sub("_", name)
     name = name.strip("._")
     if not name:
         name = f"attachment_{short_hash(url)}"
     return name[:180]
 
 
+@lru_cache(maxsize=8192)
 def infer_name_from_url(url: str) -> str:
     candidate = url.split("?")[0].rstrip("/").split("/")[-1]
     return candidate or "attachment"
 
 
+@lru_cache(maxsize=8192)
 def short_hash(value: str) -> str:
-    return hashlib.sha1(value.encode("utf-8")).hexdigest()[:12]
+    return hashlib.blake2b(value.encode("utf-8"), digest_size=6).hexdigest()
 
 
-def download_binary(url: str, path: Path) -> None:
+def download_binary(
+    url: str, path: Path, validators: dict[str, Any] | None = None, max_bytes: int | None = None
+) -> dict[str, Any] | None:
     attempts = 3
+    headers = {"Accept": "*/*", "User-Agent": "ztimeline-refresh/1.0"}
+    if validators:
+        if validators.get("etag"):
+            headers["If-None-Match"] = validators["etag"]
+        if validators.get("last_modified"):
+            headers["If-Modified-Since"] = validators["last_modified"]
     for attempt in range(1, attempts + 1):
-        request = Request(url)
-        request.add_header("Accept", "*/*")
-        request.add_header("User-Agent", "ztimeline-refresh/1.0")
-        temporary_path = path.with_suffix(f"{path.suffix}.tmp")
+        # Per-thread temporary names keep two tables that share an attachment from writing one file.
+        temporary_path = path.with_suffix(f"{path.suffix}.{threading.get_ident()}.tmp")
+        temporary_pending = False
         try:
-            with urlopen(request, timeout=180) as response:
+            with HTTP_CLIENT.open(url, headers=headers, timeout=180) as response:
+                entry: dict[str, Any] = {
+                    "etag": response.headers.get("ETag") or "",
+                    "last_modified": response.headers.get("Last-Modified") or "",
+                    "size": content_length(response.headers),
+                }
+                if max_bytes is not None and entry["size"] > max_bytes:
+                    return entry
                 path.parent.mkdir(parents=True, exist_ok=True)
+                temporary_pending = True
                 with temporary_path.open("wb") as file_handle:
-                    shutil.copyfileobj(response, file_handle)
-                temporary_path.replace(path)
-                return
+                    buffer = memoryview(bytearray(DOWNLOAD_COPY_BUFFER_BYTES))
+                    while received := response.readinto(buffer):
+                        file_handle.write(buffer[:received])
+                        if max_bytes is not None and file_handle.tell() > max_bytes:
+                            break
+                    entry["size"] = file_handle.tell()
+                    if max_bytes is not None and entry["size"] > max_bytes:
+                        return entry
+                    file_handle.flush()
+                    os.fsync(file_handle.fileno())
+                # Only a fully synced body is renamed into place, so an interrupted run never leaves a
+                # truncated file that the next run would mistake for a cached attachment.
+                os.replace(temporary_path, path)
+                temporary_pending = False
+                return entry
         except HTTPError as exc:
+            if exc.code == 304:
+                return None
             body = exc.read().decode("utf-8", errors="replace")
             if attempt < attempts and 500 <= exc.code <= 599:
                 time.sleep(attempt * 2)
@@ -1025,42 +1595,69 @@ def download_binary(url: str, path: Path) -> None:
                 continue
             raise RuntimeError(f"Attachment download failed for {url}: {exc.reason}") from exc
         finally:
-            if temporary_path.exists():
+            if temporary_pending:
                 temporary_path.unlink(missing_ok=True)
+    return None
 
 
-def write_csv(path: Path, headers: list[str], rows: list[dict[str, str]]) -> None:
+def content_length(headers: Any) -> int:
+    value = normalize_text(headers.get("Content-Length"))
+    return int(value) if value.isdigit() else 0
+
+
+def write_csv(path: Path, headers: list[str], rows: Iterable[Sequence[str]]) -> None:
     with path.open("w", encoding="utf-8-sig", newline="") as handle:
-        writer = csv.DictWriter(handle, fieldnames=headers, extrasaction="ignore")
-        writer.writeheader()
+        writer = csv.writer(handle)
+        writer.writerow(headers)
         writer.writerows(rows)
 
 
-def read_existing_rows_by_record_id(path: Path) -> tuple[list[str], dict[str, dict[str, str]]]:
+def read_existing_rows_by_record_id(path: Path) -> tuple[list[str], dict[str, list[str]]]:
     if not path.exists():
         return [], {}
 
     with path.open("r", encoding="utf-8-sig", newline="") as handle:
-        reader = csv.DictReader(handle)
-        headers = reader.fieldnames or []
-        rows_by_id: dict[str, dict[str, str]] = {}
+        reader = csv.reader(handle)
+        headers = next(reader, [])
+        if RECORD_ID_HEADER not in headers:
+            return headers, {}
+        record_id_index = headers.index(RECORD_ID_HEADER)
+        width = len(headers)
+        rows_by_id: dict[str, list[str]] = {}
         for row in reader:
-            record_id = normalize_text(row.get(RECORD_ID_HEADER))
+            if len(row) != width:
+                if not row:
+                    continue
+                row = row[:width] if len(row) > width else row + [""] * (width - len(row))
+            record_id = row[record_id_index].strip()
             if not record_id:
                 continue
-            rows_by_id[record_id] = {header: row.get(header, "") for header in headers}
+            rows_by_id[record_id] = row
 
     return headers, rows_by_id
 
 
-def prune_stale_media(media_dir: Path, used_media_files: set[str]) -> None:
-    removed = 0
-    for child in media_dir.iterdir():
-        if child.is_file() and child.name not in used_media_files:
-            child.unlink()
-            removed += 1
+def prune_stale_media(media_dir: Path, used_media_files: set[str], cached_media_files: set[str]) -> set[str]:
+    removed = cached_media_files - used_media_files
+    for name in removed:
+        (media_dir / name).unlink(missing_ok=True)
+    cached_media_files.difference_update(removed)
     if removed:
-        print(f"Pruned {removed} stale media files.")
+        print(f"Pruned {len(removed)} stale media files.")
+    return removed
+
+
+def scan_media_files(media_dir: Path) -> set[str]:
+    with os.scandir(media_dir) as entries:
+        return {entry.name for entry in entries if entry.name != MEDIA_INDEX_FILENAME and entry.is_file()}
+
+
+def read_media_index(path: Path) -> dict[str, dict[str, Any]]:
+    return {name: entry for name, entry in read_json_file(path).items() if isinstance(entry, dict)}
+
+
+def write_media_index(path: Path, media_index: dict[str, dict[str, Any]]) -> None:
+    write_metadata(path=path, metadata=dict(sorted(media_index.items())))
 
 
 def parse_cache_media_types(raw_value: str) -> set[str] | None:
@@ -1073,15 +1670,14 @@ def parse_cache_media_types(raw_value: str) -> set[str] | None:
     invalid = sorted(selected - allowed)
     if invalid:
         raise ValueError(f"Unsupported media types for --cache-media-types: {', '.join(invalid)}")
+    if selected == allowed:
+        return None
     return selected
 
 
+@lru_cache(maxsize=8192)
 def infer_attachment_type(filename: str, source_url: str) -> str:
-    value = f"{filename} {source_url}".lower()
-    match = re.search(r"\.([a-z0-9]+)(?:$|[?#)\s])", value)
-    if not match:
-        return "file"
-    extension = match.group(1)
+    extension = attachment_extension(filename, source_url)
     if extension in BLOCKED_MEDIA_EXTENSIONS:
         return "blocked"
     if extension in IMAGE_EXTENSIONS:
@@ -1091,23 +1687,24 @@ def infer_attachment_type(filename: str, source_url: str) -> str:
     return "file"
 
 
+@lru_cache(maxsize=8192)
 def is_blocked_media(filename: str, source_url: str) -> bool:
-    value = f"{filename} {source_url}".lower()
-    match = re.search(r"\.([a-z0-9]+)(?:$|[?#)\s])", value)
-    if not match:
-        return False
-    return match.group(1) in BLOCKED_MEDIA_EXTENSIONS
+    return attachment_extension(filename, source_url) in BLOCKED_MEDIA_EXTENSIONS
 
 
-def extract_media_references_from_row(row: dict[str, str]) -> set[str]:
-    references: set[str] = set()
-    for value in row.values():
-        if not value:
-            continue
-        text = str(value)
-        for match in MEDIA_REFERENCE_PATTERN.finditer(text):
-            references.add(match.group(1))
-    return references
+def attachment_extension(filename: str, source_url: str) -> str:
+    extension = os.path.splitext(filename)[1][1:].lower()
+    if extension.isascii() and extension.isalnum():
+        return extension
+    url_path = source_url.split("?", 1)[0].split("#", 1)[0]
+    extension = os.path.splitext(url_path)[1][1:].lower()
+    if extension.isascii() and extension.isalnum():
+        return extension
+    return ""
+
+
+def extract_media_references_from_row(row: Sequence[str]) -> set[str]:
+    return set(MEDIA_REFERENCE_PATTERN.findall("\n".join(row)))
 
 
 def build_delta_formula(*, last_modified_field: str, published_field: str, cursor_utc: str) -> str:
@@ -1136,8 +1733,7 @@ def formula_string(value: str) -> str:
 
 
 def is_unknown_field_error(error: RuntimeError) -> bool:
-    message = str(error)
-    return "UNKNOWN_FIELD_NAME" in message or "Unknown field names" in message
+    return isinstance(error, AirtableRequestError) and error.status == 422 and error.error_type == "UNKNOWN_FIELD_NAME"
 
 
 def is_published(value: Any) -> bool:
@@ -1202,7 +1798,7 @@ def write_site_data_bundle(*, bundle_output: Path, targets: list[ExportTarget])
         "eventsMetadata": read_metadata("events", "data/refresh-metadata.json"),
     }
 
-    json_payload = json.dumps(payload, ensure_ascii=False, separators=(",", ":"))
+    json_payload = dump_compact_json(payload)
     json_payload = json_payload.replace("\u2028", "\\u2028").replace("\u2029", "\\u2029")
     bundle_output.parent.mkdir(parents=True, exist_ok=True)
     bundle_output.write_text(f"window.__ZTIMELINE_DATA__ = {json_payload};\n", encoding="utf-8")
@@ -1249,16 +1845,38 @@ def compute_max_modified_cursor(records: list[dict[str, Any]], last_modified_fie
     return latest.isoformat() if latest else ""
 
 
-def discover_field_name_from_records(records: list[dict[str, Any]], candidates: list[str]) -> str:
-    if not records:
-        return ""
-
+def summarize_records(
+    records: list[dict[str, Any]],
+    *,
+    published_field_candidates: list[str],
+    last_modified_field_candidates: list[str],
+) -> tuple[str, str, str]:
+    # The winning last-modified field is only known at the end, so track a maximum for every candidate.
+    candidate_keys = {candidate.strip().lower() for candidate in last_modified_field_candidates}
     found: set[str] = set()
+    tracked_fields: list[str] = []
+    latest_by_field: dict[str, datetime] = {}
     for record in records:
         fields = record.get("fields", {})
-        found.update(fields.keys())
-
-    return first_matching_name(found, candidates)
+        known_count = len(found)
+        found.update(fields)
+        if len(found) != known_count:
+            tracked_fields = [name for name in found if name.strip().lower() in candidate_keys]
+        for name in tracked_fields:
+            value = fields.get(name)
+            if not value:
+                continue
+            parsed = parse_iso_datetime(value)
+            if parsed and (name not in latest_by_field or parsed > latest_by_field[name]):
+                latest_by_field[name] = parsed
+
+    last_modified_field = first_matching_name(found, last_modified_field_candidates)
+    latest = latest_by_field.get(last_modified_field)
+    return (
+        first_matching_name(found, published_field_candidates),
+        last_modified_field,
+        latest.isoformat() if latest else "",
+    )
 
 
 def resolve_known_field_name(
@@ -1288,7 +1906,7 @@ def read_json_file(path: Path) -> dict[str, Any]:
         return {}
 
     try:
-        data = json.loads(path.read_text(encoding="utf-8"))
+        data = parse_json_bytes(path.read_bytes())
     except json.JSONDecodeError:
         return {}
 